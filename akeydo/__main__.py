@@ -35,20 +35,21 @@ _DEFAULT_CONFIG_PATH = "/etc/akeydo.conf"
 
 
 async def service(config: pathlib.Path) -> None:
-    """Configure logging and error handling and start the service.
+    """Configure signal handling, start the service, and run until stopped.
 
     Args:
         config: A Path to a YAML configuration file to configure the service and
             plug-ins.
     """
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     settings = Settings(config)
     manager = AkeydoService(settings, *settings.enabled_plugins.values())
+    stopped = asyncio.Event()
 
     def signal_handler() -> None:
         """Stop the service and cleanup devices on receiving a signal."""
         manager.stop()
-        loop.stop()
+        stopped.set()
 
     for sig in (signal.SIGINT, signal.SIGQUIT, signal.SIGTERM):
         loop.add_signal_handler(sig, signal_handler)
@@ -56,8 +57,10 @@ async def service(config: pathlib.Path) -> None:
     task = create_task(manager.start())
     try:
         await task
-    except Exception as e:
+    except Exception:
         task.exception()
+        return
+    await stopped.wait()
 
 
 def configure_logging():
@@ -82,10 +85,14 @@ def configure_logging():
 def main():
     """The service entry point."""
     configure_logging()
-    loop = asyncio.get_event_loop()
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        uvloop.install()
     path = pathlib.Path(_DEFAULT_CONFIG_PATH if len(sys.argv) < 2 else sys.argv[1])
-    loop.create_task(service(path))
-    loop.run_forever()
+    asyncio.run(service(path))
 
 
 if __name__ == "__main__":
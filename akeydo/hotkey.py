@@ -8,16 +8,19 @@ Types:
 Functions:
     parse_hotkeys: Takes an optional iterable containing string values
         representing keys and if possible returns a Hotkey.
+    mask: Converts a Hotkey into an integer bitmask of its key codes.
 """
 
 from __future__ import annotations
 
+import functools
 import logging
 
 import evdev
 
 __all__ = (
     "Hotkey",
+    "mask",
     "parse_hotkeys",
 )
 
@@ -25,6 +28,25 @@ __all__ = (
 Hotkey = frozenset[int]
 
 
+def mask(hotkey: Optional[Hotkey]) -> int:
+    """Convert a hotkey into an integer bitmask of its key codes.
+
+    Comparing bitmasks is a single integer equality check, which avoids
+    allocating and hashing a new set for every key event on the replication
+    hot path.
+
+    Args:
+        hotkey: An iterable of integer key codes, or None.
+
+    Returns: An integer with one bit set for each key code in the hotkey, or
+        zero if the hotkey is None or empty.
+    """
+    result = 0
+    for key in hotkey or ():
+        result |= 1 << key
+    return result
+
+
 def parse_hotkeys(hotkey: Optional[Iterable[str]]) -> Optional[Hotkey]:
     """Convert a list of strings representing keys to a set of int codes.
 
@@ -40,12 +62,30 @@ def parse_hotkeys(hotkey: Optional[Iterable[str]]) -> Optional[Hotkey]:
         converted into an integer a warning will be logged and None will be
         returned instead of a frozenset.
     """
-    try:
-        return frozenset(evdev.ecodes.ecodes[key] for key in hotkey or ()) or None
-    except KeyError:
+    if not hotkey:
+        return None
+    return _parse(tuple(hotkey))
+
+
+@functools.lru_cache(maxsize=None)
+def _parse(hotkey: tuple[str, ...]) -> Optional[Hotkey]:
+    """Convert a tuple of key names into a Hotkey, caching the result.
+
+    The same hotkey strings arrive repeatedly from settings and VM XML, so
+    the conversion is memoized and identical hotkeys share one frozenset.
+
+    Args:
+        hotkey: A tuple of strings of the format KEY_XXX.
+
+    Returns: A frozenset of the key codes, or None if any key is unknown or
+        the tuple is empty.
+    """
+    codes = evdev.ecodes.ecodes
+    if any(key not in codes for key in hotkey):
         logging.warning(
             "Unable to match all keys in hotkey %s to integers. "
             "Hotkey will be unavailable.",
             hotkey,
         )
         return None
+    return frozenset(codes[key] for key in hotkey) or None
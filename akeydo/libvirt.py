@@ -8,10 +8,12 @@ Classes:
 
 from __future__ import annotations
 
-import functools
-import itertools
 import logging
-import xml.etree.ElementTree as xml
+
+try:
+    from lxml import etree as xml
+except ImportError:
+    import xml.etree.ElementTree as xml
 
 from . import hotkey
 
@@ -27,9 +29,24 @@ Device = tuple[int, int, int, int]
 class VirtualMachineConfig:
     """A representation of virtual-machine XML configuration values."""
 
+    __slots__ = (
+        "name",
+        "hugepages",
+        "memory",
+        "pinned_cpus",
+        "pci_devices",
+        "devices",
+        "sources",
+        "hotkey",
+        "cpuset",
+    )
+
     _NAMESPACE = "akeydo"
     _NAMESPACE_URI = "https://dev.akeydo/xmlns/libvirt/domain/1.0"
 
+    _QEMU_ARG = "{http://libvirt.org/schemas/domain/qemu/1.0}arg"
+    _HOTKEY_KEY = f"{{{_NAMESPACE_URI}}}key"
+
     _UNITS = {
         "b": 1,
         "bytes": 1,
@@ -47,81 +64,108 @@ class VirtualMachineConfig:
         "TiB": 2 ** 40,
     }
 
-    def __init__(self, xml_config: str) -> None:
+    def __init__(self, xml_config: str, settings: Optional[Settings] = None) -> None:
         """Parse libvirt XML configuration.
 
         Parses an XML configuration for a virtual machine passed to the service
-        via a libvirt hook. The relevant values are stored on this object for
-        later reference.
-
-        Args:
-            xml_config: The XML configuration for a virtual machine that was
-                passed to the service through a VM hook.
-        """
-        root: xml.Element = xml.fromstring(xml_config)
-        self.name: str = root.findtext(".//name")
-        self.hugepages: bool = root.find(".//memoryBacking/hugepages") is not None
-        self.memory: int = self._parse_memory(root)
-        self.pinned_cpus: set[int] = self._parse_cpusets(root)
-        self.pci_devices: set[Device] = self._parse_pci_devices(root)
-        self.devices: set[str] = self._parse_devices(root, self.name)
-        self.hotkey: Optional[hotkey.Hotkey] = self._parse_hotkey(root)
-
-    @functools.cached_property
-    def cpuset(self) -> int:
-        """An integer mask representing the pinned CPUs for this VM."""
-        mask = 0
-        for cpu in self.pinned_cpus:
-            mask |= 1 << cpu
-        return mask
-
-    def _parse_memory(self, root) -> int:
-        """Parse memory from memory elements.
-
-        Args:
-            root: The root element of the libvirt domain XML.
+        via a libvirt hook. The document tree is walked exactly once and all
+        relevant values are stored on this object for later reference.
 
-        Returns: The number of bytes required by the virtual machine.
-        """
-        element = root.find(".//memory")
-        unit = element.get("unit", "b")
-        mem = int(element.text or "0")
-        return mem * self._UNITS[unit]
+        When settings are given, values consumed only by disabled plug-ins are
+        skipped during the walk and left at their defaults rather than parsed
+        and then dropped.
 
-    def _parse_pci_devices(self, root: xml.Element) -> set[Device]:
-        """Parse PCI devices from hostdev elements.
+        Hotkeys are parsed from the VM metadata using the `akeydo` namespace
+        with the following structure:
 
-        Args:
-            root: The root element of the libvirt domain XML.
-
-        Returns: A set of 4-tuples containing the integer represetations of the
-            domain, bus, slot, and function of each device.
-        """
-        return frozenset(
-            (
-                int(e.get("domain", "0"), base=16),
-                int(e.get("bus", "0"), base=16),
-                int(e.get("slot", "0"), base=16),
-                int(e.get("function", "0"), base=16),
-            )
-            for e in root.findall(".//devices/hostdev[@type='pci']/source/address")
-        )
-
-    def _parse_cpusets(self, root: xml.Element) -> set[int]:
-        """Parse cpusets from vcpupin elements.
+        ```xml
+        <akeydo:settings>
+            <akeydo:hotkey>
+                <akeydo:key value="KEY_LEFTCTRL" />
+                <akeydo:key value="KEY_LEFTALT" />
+                <akeydo:key value="KEY_KP1" />
+            </akeydo:hotkey>
+        </akeydo:settings>
+        ```
 
         Args:
-            root: The root element of the libvirt domain XML.
-
-        Returns: A set containing all of the CPUs that are pinned.
+            xml_config: The XML configuration for a virtual machine that was
+                passed to the service through a VM hook.
+            settings: Optional global settings used to skip values that no
+                enabled plug-in consumes.
         """
-        return frozenset(
-            itertools.chain.from_iterable(
-                self._parse_cpuset(cpuset)
-                for element in root.findall(".//cputune/vcpupin")
-                for cpuset in (element.get("cpuset") or "").split(",")
-            )
-        )
+        root: xml.Element = xml.fromstring(xml_config.encode())
+        self.name: str = root.findtext("name")
+        self.hugepages: bool = False
+        self.memory: int = 0
+        pinned_cpus: list[int] = []
+        pci_devices: list[Device] = []
+        devices: set[str] = set()
+        keys: list[str] = []
+        device_prefix = f"/dev/input/by-id/{self.name}-"
+        qemu_prefix = f"evdev={device_prefix}"
+        memory_seen = False
+        enabled = settings.enabled_plugins if settings else None
+        parse_cpu = enabled is None or "cpu" in enabled
+        parse_memory = enabled is None or "memory" in enabled
+        parse_pci = enabled is None or "gpu" in enabled
+        parse_devices = enabled is None or "devices" in enabled
+        for element in root.iter():
+            tag = element.tag
+            if tag == "vcpupin":
+                if parse_cpu:
+                    for cpuset in (element.get("cpuset") or "").split(","):
+                        pinned_cpus.extend(self._parse_cpuset(cpuset))
+            elif tag == "memory" and not memory_seen:
+                memory_seen = True
+                if parse_memory:
+                    self.memory = int(element.text or "0") * self._UNITS[
+                        element.get("unit", "b")
+                    ]
+            elif tag == "hugepages":
+                self.hugepages = parse_memory
+            elif parse_pci and tag == "hostdev" and element.get("type") == "pci":
+                address = element.find("source/address")
+                if address is not None:
+                    pci_devices.append(
+                        (
+                            int(address.get("domain", "0"), base=16),
+                            int(address.get("bus", "0"), base=16),
+                            int(address.get("slot", "0"), base=16),
+                            int(address.get("function", "0"), base=16),
+                        )
+                    )
+            elif (
+                parse_devices
+                and tag == "input"
+                and element.get("type") == "passthrough"
+            ):
+                source = element.find("source")
+                if source is not None and (
+                    dev := source.get("evdev", "")
+                ).startswith(device_prefix):
+                    devices.add(dev)
+            elif (
+                parse_devices
+                and tag == self._QEMU_ARG
+                and qemu_prefix in (value := element.get("value", ""))
+            ):
+                devices.update(
+                    param[6:]
+                    for param in value.split(",")
+                    if param.startswith(qemu_prefix)
+                )
+            elif parse_devices and tag == self._HOTKEY_KEY:
+                keys.append(element.get("value"))
+        self.pinned_cpus: set[int] = frozenset(pinned_cpus)
+        cpuset = 0
+        for cpu in pinned_cpus:
+            cpuset |= 1 << cpu
+        self.cpuset: int = cpuset
+        self.pci_devices: set[Device] = frozenset(pci_devices)
+        self.devices: frozenset[str] = frozenset(devices)
+        self.sources: set[str] = self._resolve_sources(devices, self.name)
+        self.hotkey: Optional[hotkey.Hotkey] = hotkey.parse_hotkeys(keys or None)
 
     @staticmethod
     def _parse_cpuset(cpuset: str) -> Iterable[int]:
@@ -145,95 +189,26 @@ class VirtualMachineConfig:
             logging.warning("Unable to parse cpuset %s", cpuset)
             return ()
 
-    def _parse_devices(self, root: xml.Element, name: str) -> set[str]:
-        """Parse devices to be generated for this VM.
-
-        Args:
-            root: The root element of the libvirt domain XML.
-            name: The name of the virtual machine that will be stripped from the
-                parsed devices in order to get the base devices.
-
-        Returns: A set of all devices that will be toggled between the host and
-            the active virtual machines.
-        """
-        return self._parse_passthrough_inputs(root, name) | self._parse_qemu_arg_evdev(
-            root, name
-        )
-
-    @staticmethod
-    def _parse_passthrough_inputs(root: xml.Element, name: str) -> set[str]:
-        """Parse devices to be generated for this VM from libvirt devices.
-
-        Args:
-            root: The root element of the libvirt domain XML.
-            name: The name of the virtual machine that will be stripped from the
-                parsed devices in order to get the base devices.
-
-        Returns: A set of devices that will be toggled between the host and the
-            active virtual machines that are configured as libvirt passthrough
-            devices.
-        """
-        return {
-            dev
-            for e in root.findall(".//devices/input[@type='passthrough']/source")
-            if (dev := e.get("evdev", "")).startswith(f"/dev/input/by-id/{name}-")
-        }
-
     @staticmethod
-    def _parse_qemu_arg_evdev(root: xml.Element, name: str) -> set[str]:
-        """Parse devices to be generated for this VM from QEMU args.
+    def _resolve_sources(devices: Iterable[str], name: str) -> set[str]:
+        """Resolve guest device paths to their host source devices.
 
-        This method is no longer recommended as it is adds complexity and risk
-        to passing through devices; however, this is still commonly used and, as
-        such, must be supported.
+        Each guest device is of the form:
+            /dev/input/by-id/{name}-{device-ID}
+        The virtual machine name prefix is stripped to give the host source
+        device:
+            /dev/input/by-id/{device-ID}
 
         Args:
-            root: The root element of the libvirt domain XML.
-            name: The name of the virtual machine that will be stripped from the
-                parsed devices in order to get the base devices.
+            devices: The guest device paths parsed from the XML. Each is
+                guaranteed to start with the prefix because parsing filters on
+                it.
+            name: The name of the virtual machine to strip from each device.
 
-        Returns: A set of devices that will be toggled between the host and the
-            active virtual machines that are configured as QEMU args.
+        Returns: A set of host source device paths.
         """
+        prefix_length = len(f"/dev/input/by-id/{name}-")
         return {
-            param[6:]
-            for e in root.findall(
-                ".//qemu:commandline/qemu:arg",
-                {"qemu": "http://libvirt.org/schemas/domain/qemu/1.0"},
-            )
-            if "evdev=" in (val := e.get("value", ""))
-            for param in val.split(",")
-            if param.startswith(f"evdev=/dev/input/by-id/{name}-")
+            f"/dev/input/by-id/{device[prefix_length:]}" for device in devices
         }
 
-    def _parse_hotkey(self, root: xml.Element) -> Optional[hotkey.Hotkey]:
-        """Parse a Hotkey from the VM metadata to toggle directly to this VM.
-
-        The expected structure uses the `akeydo` namespace and should look like
-        the following:
-
-        ```xml
-        <akeydo:settings>
-            <akeydo:hotkey>
-                <akeydo:key value="KEY_LEFTCTRL" />
-                <akeydo:key value="KEY_LEFTALT" />
-                <akeydo:key value="KEY_KP1" />
-            </akeydo:hotkey>
-        </akeydo:settings>
-        ```
-
-        Args:
-            root: The root element of the libvirt domain XML.
-
-        Returns: An optional hotkey
-        """
-        return hotkey.parse_hotkeys(
-            e.get("value")
-            for e in root.findall(
-                ".//metadata/"
-                f"{self._NAMESPACE}:settings/"
-                f"{self._NAMESPACE}:hotkey/"
-                f"{self._NAMESPACE}:key",
-                {self._NAMESPACE: self._NAMESPACE_URI},
-            )
-        )
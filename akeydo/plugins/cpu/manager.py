@@ -28,9 +28,11 @@ class Manager:
         """Restrict kernel processes to pinned CPUs."""
         if not config.pinned_cpus:
             return
-        logging.info(
-            "Pinning CPUs: %s", ", ".join(str(c) for c in sorted(config.pinned_cpus))
-        )
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info(
+                "Pinning CPUs: %s",
+                ", ".join(str(c) for c in sorted(config.pinned_cpus)),
+            )
         self._driver.shield_cpu(*config.pinned_cpus)
         if not self._shielded_vms:
             system.set("/proc/sys/vm/stat_interval", 120)
@@ -42,9 +44,11 @@ class Manager:
         """Remove process restrictions to CPUs used by the the virtual machine."""
         if not config.pinned_cpus:
             return
-        logging.info(
-            "Unpinning CPUs: %s", ", ".join(str(c) for c in sorted(config.pinned_cpus))
-        )
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info(
+                "Unpinning CPUs: %s",
+                ", ".join(str(c) for c in sorted(config.pinned_cpus)),
+            )
         self._driver.unshield_cpu(*config.pinned_cpus)
         self._shielded_vms -= 1
         if not self._shielded_vms:
@@ -15,18 +15,54 @@ from typing import (
     cast,
 )
 import asyncio
-import functools
 import logging
 import os
 import stat
+import struct
 import threading
 
 import evdev
 
-from ...hotkey import Hotkey
+try:
+    from inotify_simple import (
+        INotify,
+        flags as inotify_flags,
+    )
+except ImportError:
+    INotify = None
+
+from ...hotkey import (
+    Hotkey,
+    mask,
+)
 from ...task import create_task, handle_exception
 
-__all__ = ("ReplicatedDevice",)
+__all__ = (
+    "BY_ID",
+    "ReplicatedDevice",
+)
+
+
+# The directory where virtual device symlinks are created. Fixed on Linux,
+# so the path prefix is built once at import rather than joined per call.
+BY_ID = "/dev/input/by-id"
+
+_EV_KEY = evdev.ecodes.EV_KEY
+_EV_SYN = evdev.ecodes.EV_SYN
+_SYN_REPORT = evdev.ecodes.SYN_REPORT
+_SYN_DROPPED = evdev.ecodes.SYN_DROPPED
+
+# The layout of struct input_event: two native longs for the timestamp
+# followed by the event type, code, and value.
+_INPUT_EVENT = struct.Struct("llHHi")
+_SYN_EVENT = _INPUT_EVENT.pack(0, 0, _EV_SYN, _SYN_REPORT, 0)
+
+# Sentinel chord actions. VM chords map to the VM name (or None for the
+# host), so distinct objects mark the release and toggle chords and a missed
+# lookup.
+_RELEASE = object()
+_TOGGLE = object()
+_NO_ACTION = object()
 
 
 class ReplicatedDevice:
@@ -38,6 +74,25 @@ class ReplicatedDevice:
     forwarded to the currently active target.
     """
 
+    __slots__ = (
+        "_settings",
+        "_delay",
+        "_source_path",
+        "_name",
+        "_source",
+        "_capabilities",
+        "_manager",
+        "_targets",
+        "_active_target",
+        "_grabbed",
+        "_persistent",
+        "_chord_actions",
+        "_chord_union",
+        "_idle_devices",
+        "_grab_task",
+        "_replicate_task",
+    )
+
     HOST = None
 
     def __init__(
@@ -46,6 +101,7 @@ class ReplicatedDevice:
         manager: AkeydoService,
         settings: Settings,
         host_hotkey: Optional[Hotkey] = None,
+        persistent: bool = False,
     ) -> None:
         """Initialize a new device to be monitored and replicated.
 
@@ -57,24 +113,45 @@ class ReplicatedDevice:
             settings: Global settings for hotkeys and plug-in options.
             host_hotkey: An optional hotkey that will cause an immediate switch
                 to the host device.
+            persistent: Whether the device should keep running after the last
+                virtual machine using it is removed. Devices configured in the
+                settings are persistent so they keep listening for hotkeys.
         """
-        if not os.path.exists(source) or not stat.S_ISCHR(os.stat(source).st_mode):
-            raise IOError(f"No such device: {source}")
+        try:
+            source_stat = os.stat(source)
+        except FileNotFoundError:
+            raise OSError(f"No such device: {source}")
+        if not stat.S_ISCHR(source_stat.st_mode):
+            raise OSError(f"Not a character device: {source}")
         self._settings: Settings = settings
+        self._delay: float = settings.hotkeys.delay / 1000.0
         self._source_path: str = source
+        self._name: str = os.path.basename(source)
         self._source: Optional[evdev.InputDevice] = None
+        self._capabilities: Optional[dict] = None
         self._manager: AkeydoService = manager
         self._targets: Dict[Union[bool, None, str], evdev.InputDevice] = {}
-        self._hotkeys: Dict[Hotkey, Optional[str]] = {}
+        self._active_target: Optional[evdev.UInput] = None
+        self._grabbed: Optional[evdev.UInput] = None
+        self._persistent: bool = persistent
+        # All chords share one dict so the hot path resolves a pressed mask
+        # to its action with a single lookup. Chords must therefore be
+        # distinct; a chord reused for two actions keeps only the last one.
+        self._chord_actions: Dict[int, object] = {}
+        self._idle_devices: list[evdev.UInput] = []
         self._grab_task: Optional[asyncio.Task] = None
         self._replicate_task: Optional[asyncio.Task] = None
+        release_mask = mask(settings.hotkeys.release)
+        if release_mask:
+            self._chord_actions[release_mask] = _RELEASE
+        toggle_mask = mask(settings.hotkeys.toggle)
+        if toggle_mask:
+            self._chord_actions[toggle_mask] = _TOGGLE
         if host_hotkey:
-            self._hotkeys[host_hotkey] = self.HOST
-
-    @functools.cached_property
-    def _name(self):
-        """Return the base name of the device."""
-        return os.path.basename(self._source_path)
+            self._chord_actions[mask(host_hotkey)] = self.HOST
+        self._chord_union: int = 0
+        for chord in self._chord_actions:
+            self._chord_union |= chord
 
     def _get_device_path(self, target: str) -> str:
         """Get the device path of the virtual device for the target.
@@ -85,13 +162,7 @@ class ReplicatedDevice:
 
         Returns: The path to the virtual device on the file system.
         """
-        return os.path.join(
-            os.sep,
-            "dev",
-            "input",
-            "by-id",
-            f"{target}-{self._name}",
-        )
+        return f"{BY_ID}/{target}-{self._name}"
 
     def _create_device(
         self, target: str, *, key: Union[bool, None, str] = False
@@ -111,15 +182,25 @@ class ReplicatedDevice:
         """
         path = self._get_device_path(target)
         logging.info("Creating %s device %s", target, path)
-        device = evdev.UInput.from_device(self._source)
+        if self._idle_devices:
+            device = self._idle_devices.pop()
+        else:
+            if self._capabilities is None:
+                capabilities = self._source.capabilities()
+                # UInput manages EV_SYN itself and force feedback is not
+                # replicated.
+                for event_type in (_EV_SYN, evdev.ecodes.EV_FF):
+                    capabilities.pop(event_type, None)
+                self._capabilities = capabilities
+            device = evdev.UInput(self._capabilities)
         self._targets[key if key is not False else target] = device
         try:
-            if os.path.islink(path):
-                logging.debug("Removing existing symlink %s", path)
-                os.unlink(path)
-        except IOError:
-            pass
-        os.symlink(device.device, path)
+            os.symlink(device.device, path)
+        except FileExistsError:
+            logging.debug("Replacing existing symlink %s", path)
+            os.unlink(path)
+            os.symlink(device.device, path)
+        self.retarget()
 
     def _destroy_device(
         self, target: str, *, key: Union[bool, None, str] = False
@@ -143,47 +224,94 @@ class ReplicatedDevice:
         path = self._get_device_path(target)
         logging.info("Destroying %s device %s", target, path)
         try:
-            if os.path.islink(path):
-                logging.debug("Removing symlink %s", path)
-                os.unlink(path)
-        except IOError:
-            pass
-        try:
-            self._targets.pop(index).close()
-        except IOError:
+            os.unlink(path)
+            logging.debug("Removed symlink %s", path)
+        except FileNotFoundError:
             pass
+        self._idle_devices.append(self._targets.pop(index))
+        self.retarget()
 
     async def _grab_source(self) -> None:
         """Grab the source device if it is ungrabbed.
 
-        This task grabs the source device if it is ungrabbed and attempts to
-        re-grab it every ten seconds in case the device was disconnected.
+        This task grabs the source device and re-grabs it whenever it may have
+        been reconnected. If inotify is available, the retry is driven by
+        events on the directory containing the source device so a reconnected
+        device is grabbed as soon as the kernel recreates it. Otherwise the
+        task falls back to re-grabbing every ten seconds.
         """
+        watcher = self._get_source_watcher()
         try:
             while 1:
                 try:
                     if self._source:
                         self._source.grab()
                         logging.debug("Grabbed source device %s", self._source.path)
-                except IOError:
+                except OSError:
                     pass
-                await asyncio.sleep(10)
+                await self._wait_for_source_change(watcher)
         except asyncio.CancelledError:
             self._grab_task = None
+        finally:
+            if watcher:
+                watcher.close()
+
+    def _get_source_watcher(self) -> Optional[INotify]:
+        """Create an inotify watcher for the source device directory.
+
+        Returns: A non-blocking INotify instance watching the directory
+            containing the source device, or None if inotify is unavailable.
+        """
+        if not INotify:
+            return None
+        try:
+            watcher = INotify(nonblocking=True)
+            watcher.add_watch(
+                os.path.dirname(self._source_path),
+                inotify_flags.CREATE
+                | inotify_flags.ATTRIB
+                | inotify_flags.MOVED_TO,
+            )
+            return watcher
+        except OSError:
+            return None
+
+    async def _wait_for_source_change(self, watcher: Optional[INotify]) -> None:
+        """Wait until the source device may need to be re-grabbed.
+
+        Args:
+            watcher: An optional inotify watcher for the source device
+                directory. If given, this waits for the next directory event
+                and drains the queue. Otherwise it sleeps for ten seconds.
+        """
+        if not watcher:
+            await asyncio.sleep(10)
+            return
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        loop.add_reader(watcher.fileno(), ready.set)
+        try:
+            await ready.wait()
+        finally:
+            loop.remove_reader(watcher.fileno())
+        watcher.read(timeout=0)
 
     @property
     def _target(self) -> Optional[evdev.device.InputDevice]:
         """Get the device for the currently active target."""
-        target = self._targets.get(self._manager.target)
+        return self._active_target
+
+    def retarget(self) -> None:
+        """Refresh the cached device for the currently active target.
+
+        The device for the active target is resolved once here rather than
+        once per replicated event. This must be called whenever the manager
+        target or released state changes or the target map is altered.
+        """
+        self._active_target = self._targets.get(self._manager.target)
         logging.trace(
             "Current target for device %s is %s", self._name, self._manager.target
         )
-        return target
-
-    @functools.cached_property
-    def _delay(self) -> float:
-        """The delay to wait between switching targets in seconds."""
-        return self._settings.hotkeys.delay / 1000.0
 
     async def _replicate(self) -> None:
         """Listen to the source for hotkeys and pass events to the target.
@@ -200,6 +328,14 @@ class ReplicatedDevice:
 
         All other events are forwarded to the current target if the device has
         a mapping for the current target.
+
+        Events are drained in batches: the loop waits for the source
+        descriptor to become readable, reads a batch of raw input_event
+        structs straight off the descriptor, and processes them in a tight
+        synchronous inner loop so bursts from high-rate devices cost one
+        scheduler round trip instead of one per event. Raw bytes are
+        forwarded to the target verbatim; only key events are unpacked for
+        the hotkey logic, so no Python event objects are built at all.
         """
         try:
             if not self._source:
@@ -207,94 +343,161 @@ class ReplicatedDevice:
 
             source = self._source
 
+            # Mutated in place by add/remove, so binding the dict itself is
+            # safe here.
+            chord_actions = self._chord_actions
+
             is_release = False
+            is_toggle = False
+            hotkey_triggered: Optional[int] = None
 
-            async def handle_release(
-                event: evdev.InputEvent, active_keys: Hotkey
-            ) -> None:
-                """Detect the release hotkey and trigger a device release.
+            def handle_key(value: int, pressed: int) -> bool:
+                """Track hotkey chords for a single key event.
 
                 Args:
-                    event: The current device input.
-                    active_keys: The set of currently pressed keys.
-                """
-                nonlocal is_release
-                if event.value == 1 and active_keys == self._settings.hotkeys.release:
-                    is_release = True
-                elif self._target and is_release and not source.active_keys():
-                    self._target.syn()
-                    await asyncio.sleep(self._delay)
-                    is_release = False
-                    self._manager.released = not self._manager.released
+                    value: The value of the key event; 1 for a key press.
+                    pressed: The bitmask of currently pressed keys.
 
-            is_toggle = False
+                Returns: True if a pending chord action is ready to fire.
+                """
+                nonlocal is_release, is_toggle, hotkey_triggered
+                if value == 1:
+                    action = chord_actions.get(pressed, _NO_ACTION)
+                    if action is _RELEASE:
+                        is_release = True
+                    elif action is _TOGGLE:
+                        is_toggle = True
+                    elif action is not _NO_ACTION:
+                        hotkey_triggered = pressed
+                    return False
+                return not pressed and (
+                    is_release or is_toggle or hotkey_triggered is not None
+                )
 
-            async def handle_toggle(
-                event: evdev.InputEvent, active_keys: Hotkey
-            ) -> None:
-                """Detect the toggle hotkey and toggle the currently active target.
+            async def fire_pending(target: evdev.UInput) -> None:
+                """Perform the pending chord actions after all keys release.
 
                 Args:
-                    event: The current device input.
-                    active_keys: The set of currently pressed keys.
+                    target: The device the completed frame was forwarded to.
+                        Passed in because retarget() may clear the cached
+                        active target from another thread at any time.
                 """
-                nonlocal is_toggle
-                if event.value == 1 and active_keys == self._settings.hotkeys.toggle:
-                    is_toggle = True
-                elif self._target and is_toggle and not source.active_keys():
-                    self._target.syn()
+                nonlocal is_release, is_toggle, hotkey_triggered
+                target.syn()
+                if self._delay:
                     await asyncio.sleep(self._delay)
+                if is_release:
+                    is_release = False
+                    self._manager.released = not self._manager.released
+                if is_toggle:
                     is_toggle = False
                     self._manager.toggle()
-
-            hotkey_triggered: Optional[Hotkey] = None
-
-            async def handle_hotkeys(
-                event: evdev.InputEvent, active_keys: Hotkey
-            ) -> None:
-                """Detect VM hotkeys and toggle to specific virtual machines.
-
-                Args:
-                    event: The current device input.
-                    active_keys: The set of currently pressed keys.
-                """
-                nonlocal hotkey_triggered
-                if event.value == 1 and active_keys in self._hotkeys:
-                    hotkey_triggered = active_keys
-                elif self._target and hotkey_triggered and not source.active_keys():
-                    self._target.syn()
-                    await asyncio.sleep(self._delay)
-                    self._manager.target = self._hotkeys[hotkey_triggered]
+                if hotkey_triggered is not None:
+                    self._manager.target = chord_actions[hotkey_triggered]
                     hotkey_triggered = None
 
-            async for event in source.async_read_loop():
-                if self._target:
-                    self._target.write_event(event)
-                    if event.type == evdev.ecodes.EV_KEY:
-                        active_keys = frozenset(source.active_keys())
-                        await asyncio.gather(
-                            *(
-                                f(event, active_keys)
-                                for f in (handle_release, handle_toggle, handle_hotkeys)
-                            )
-                        )
+            # Hoist frequently used names into locals so the per-event fast
+            # path avoids repeated global and attribute lookups.
+            ev_key = _EV_KEY
+            ev_syn = _EV_SYN
+            syn_report = _SYN_REPORT
+            syn_dropped = _SYN_DROPPED
+            event_size = _INPUT_EVENT.size
+            unpack = _INPUT_EVENT.unpack
+            source_fd = source.fd
+
+            pressed_mask = mask(source.active_keys())
+
+            loop = asyncio.get_running_loop()
+            ready = asyncio.Event()
+            loop.add_reader(source_fd, ready.set)
+            frame = bytearray()
+            key_events: list[tuple[int, int]] = []
+            try:
+                while 1:
+                    await ready.wait()
+                    ready.clear()
+                    try:
+                        data = os.read(source_fd, event_size * 256)
+                    except BlockingIOError:
+                        continue
+                    for offset in range(0, len(data), event_size):
+                        record = data[offset : offset + event_size]
+                        _, _, event_type, code, value = unpack(record)
+                        if event_type == ev_key:
+                            frame += record
+                            bit = 1 << code
+                            if value == 1:
+                                pressed_mask |= bit
+                            elif value == 0:
+                                pressed_mask &= ~bit
+                            key_events.append((code, value))
+                            continue
+                        if event_type == ev_syn and code == syn_dropped:
+                            # The kernel overran its buffer and discarded
+                            # events, possibly including key releases, so the
+                            # incremental mask can no longer be trusted.
+                            # Resync from the device and drop the partial
+                            # frame.
+                            pressed_mask = mask(source.active_keys())
+                            frame.clear()
+                            key_events.clear()
+                            continue
+                        frame += record
+                        if event_type != ev_syn or code != syn_report:
+                            continue
+                        target = self._target
+                        if target:
+                            os.write(target.fd, frame)
+                            if key_events:
+                                fire = False
+                                trigger_mask = self._chord_union
+                                for key_code, key_value in key_events:
+                                    # Keys that belong to no hotkey only need
+                                    # the handler when a chord is pending
+                                    # release.
+                                    if (
+                                        not is_release
+                                        and not is_toggle
+                                        and hotkey_triggered is None
+                                        and not trigger_mask
+                                        & (1 << key_code)
+                                    ):
+                                        continue
+                                    fire = (
+                                        handle_key(key_value, pressed_mask)
+                                        or fire
+                                    )
+                                if fire:
+                                    await fire_pending(target)
+                        frame.clear()
+                        key_events.clear()
+            finally:
+                loop.remove_reader(source_fd)
         except asyncio.CancelledError:
             self._replicate_task = None
 
     def grab(self) -> None:
         """Send the QEMU hotkey to a VM to force it to grab devices."""
-        if not self._manager.target or not self._target:
+        target = self._target
+        if not self._manager.target or not target:
+            self._grabbed = None
+            return
+        if target is self._grabbed:
             return
         try:
-            self._target.device.grab()
-            self._target.device.ungrab()
-        except IOError:
+            target.device.grab()
+            target.device.ungrab()
+        except OSError:
             return
         logging.debug("Grabbing device %s", self._get_device_path(self._manager.target))
-        for value in (1, 0):
-            for key in self._settings.hotkeys.qemu or ():
-                self._target.write(evdev.ecodes.EV_KEY, key, value)
-        self._target.syn()
+        events = b"".join(
+            _INPUT_EVENT.pack(0, 0, _EV_KEY, key, value)
+            for value in (1, 0)
+            for key in self._settings.hotkeys.qemu or ()
+        )
+        os.write(target.fd, events + _SYN_EVENT)
+        self._grabbed = target
 
     def start(self) -> None:
         """Create source devices and tasks for grabbing and replicating.
@@ -354,15 +557,22 @@ class ReplicatedDevice:
                 self._destroy_device(
                     cast(str, target) if target else "host", key=target
                 )
+            for device in self._idle_devices:
+                try:
+                    device.close()
+                except OSError:
+                    pass
+            self._idle_devices.clear()
             if self._source:
                 try:
                     self._source.ungrab()
                     logging.info("Ungrabbed device %s", self._source.path)
                     self._source.close()
-                except IOError:
+                except OSError:
                     pass
                 finally:
                     self._source = None
+                    self._capabilities = None
 
         if self._grab_task:
             self._grab_task.get_loop().call_soon_threadsafe(destroy)
@@ -378,7 +588,9 @@ class ReplicatedDevice:
                 machine.
         """
         if hotkey:
-            self._hotkeys[hotkey] = vm_name
+            chord = mask(hotkey)
+            self._chord_actions[chord] = vm_name
+            self._chord_union |= chord
             logging.debug("Adding hotkey %s to VM %s", hotkey, vm_name)
         self.start()
         self._create_device(vm_name)
@@ -395,6 +607,10 @@ class ReplicatedDevice:
         """
         self._destroy_device(vm_name)
         if hotkey:
-            self._hotkeys.pop(hotkey, None)
-        if len(self._targets) == 1:
+            self._chord_actions.pop(mask(hotkey), None)
+            union = 0
+            for chord in self._chord_actions:
+                union |= chord
+            self._chord_union = union
+        if len(self._targets) == 1 and not self._persistent:
             self.stop()
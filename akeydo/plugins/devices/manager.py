@@ -7,9 +7,13 @@ Classes:
 from __future__ import annotations
 
 import asyncio
+import logging
 import os
 
-from .input import ReplicatedDevice
+from .input import (
+    BY_ID,
+    ReplicatedDevice,
+)
 
 
 class Manager:
@@ -32,6 +36,35 @@ class Manager:
         self._settings: Settings = settings
         self._service: AkeydoService = service
         self._devices: dict[str, ReplicatedDevice] = {}
+        self._configured: set[str] = set()
+        self._host_hotkey: Optional[Hotkey] = settings.hotkeys.host
+        self._vm_hotkeys: dict[str, Hotkey] = settings.hotkeys.virtual_machines
+
+    async def start(self) -> None:
+        """Start replicated devices for sources configured in the settings.
+
+        Devices listed in the `by_id` setting are started as soon as the
+        service starts so they listen for hotkeys even before any virtual
+        machine requests them.
+        """
+        for name in self._settings.devices.by_id:
+            source = name if os.path.isabs(name) else f"{BY_ID}/{name}"
+            self._configured.add(source)
+            if source in self._devices:
+                continue
+            try:
+                device = ReplicatedDevice(
+                    source,
+                    self._service,
+                    self._settings,
+                    self._host_hotkey,
+                    persistent=True,
+                )
+            except OSError:
+                logging.warning("Unable to open configured device %s", source)
+                continue
+            self._devices[source] = device
+            device.start()
 
     async def vm_prepare(self, vm_name: str, config: VirtualMachineConfig) -> None:
         """Create devices requested in the virtual machine's XML configuration.
@@ -62,14 +95,7 @@ class Manager:
             guest_hotkey: A hotkey that the device should monitor to switch the
                 target to this specific virtual machine.
         """
-        for guest_source in config.devices:
-            source = os.path.join(
-                os.sep,
-                "dev",
-                "input",
-                "by-id",
-                os.path.basename(guest_source)[len(vm_name) + 1 :],
-            )
+        for source in config.sources:
             if source not in self._devices:
                 i = 0
                 while 1:
@@ -78,10 +104,11 @@ class Manager:
                             source,
                             self._service,
                             self._settings,
-                            self._settings.hotkeys.host,
+                            self._host_hotkey,
+                            persistent=source in self._configured,
                         )
                         break
-                    except IOError:
+                    except OSError:
                         if i >= self._settings.devices.wait_duration:
                             raise
                         await asyncio.sleep(1)
@@ -89,7 +116,7 @@ class Manager:
             device = self._devices[source]
             device.add(
                 vm_name,
-                config.hotkey or self._settings.hotkeys.virtual_machines.get(vm_name),
+                config.hotkey or self._vm_hotkeys.get(vm_name),
             )
 
     async def vm_release(self, vm_name: str, config: VirtualMachineConfig) -> None:
@@ -119,20 +146,13 @@ class Manager:
                 target to this specific virtual machine. This is necessary to
                 remove it from the hotkeys monitored by the device.
         """
-        for guest_source in config.devices:
-            source = os.path.join(
-                os.sep,
-                "dev",
-                "input",
-                "by-id",
-                os.path.basename(guest_source)[len(vm_name) + 1 :],
-            )
+        for source in config.sources:
             device = self._devices[source]
             device.remove(
                 vm_name,
-                config.hotkey or self._settings.hotkeys.virtual_machines.get(vm_name),
+                config.hotkey or self._vm_hotkeys.get(vm_name),
             )
-            if not self._service.vm_count:
+            if not self._service.vm_count and source not in self._configured:
                 del self._devices[source]
                 del device
 
@@ -142,6 +162,18 @@ class Manager:
             device.stop()
 
     async def target_changed(self, _: Optional[str]) -> None:
-        """Ensure all devices are grabbed after the target changes."""
+        """Ensure all devices are grabbed after the target changes.
+
+        The grabs issue blocking uinput writes, so they run in threads and
+        overlap rather than serializing on the service loop.
+        """
+        for device in self._devices.values():
+            device.retarget()
+        await asyncio.gather(
+            *(asyncio.to_thread(device.grab) for device in self._devices.values())
+        )
+
+    def target_release(self, _: bool) -> None:
+        """Refresh cached targets after the released state changes."""
         for device in self._devices.values():
-            device.grab()
+            device.retarget()
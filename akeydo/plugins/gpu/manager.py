@@ -99,8 +99,11 @@ class Manager:
         if os.path.isfile(path):
             with open(path) as file:
                 is_boot_gpu = bool(int(file.read(1)))
-                is_boot_gpu_format = "" if is_boot_gpu else " not"
-                logging.debug(f"Device %s is{is_boot_gpu_format} boot GPU", device_name)
+                logging.debug(
+                    "Device %s is%s boot GPU",
+                    device_name,
+                    "" if is_boot_gpu else " not",
+                )
                 return is_boot_gpu
         return False
 
@@ -116,7 +119,7 @@ class Manager:
             and tuple(int(component, base=16) for component in d.split("_")[1:])
             in config.pci_devices
         ]
-        logging.debug(f"Matching virsh devices: {devices}")
+        logging.debug("Matching virsh devices: %s", devices)
         return devices
 
     def _nodedev_detach(self, node_devices):
@@ -68,8 +68,8 @@ class HugePages:
         return meminfo
 
     def _get_pages(self, bytes_: int) -> int:
-        mem_in_kb = bytes_ // 1024 + bytes_ // 1024 % 2
-        return mem_in_kb // self._size + mem_in_kb // 1024 % 2
+        mem_in_kb = (bytes_ + 1023) // 1024
+        return (mem_in_kb + self._size - 1) // self._size
 
     def _assert_memory(self, pages: int) -> None:
         meminfo = self._get_meminfo()
@@ -92,7 +92,7 @@ class HugePages:
     async def _wait_for_allocation(self, allocated, pages):
         if self.allocated < allocated + pages:
             for _ in range(self._wait_duration):
-                asyncio.sleep(1)
+                await asyncio.sleep(1)
                 if self.allocated >= allocated + pages:
                     return
             raise IOError(
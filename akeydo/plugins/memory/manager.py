@@ -81,7 +81,7 @@ class Manager:
         driver.deallocate(memory)
 
     def _get_hugepages_driver(self, memory: int) -> hugepages.HugePages:
-        mem_in_kb = memory // 1024 + memory // 1024 % 2
+        mem_in_kb = (memory + 1023) // 1024
         if mem_in_kb >= hugepages.HugePageSize.HUGEPAGES_1G:
             return hugepages.HugePages()
         return hugepages.HugePages(
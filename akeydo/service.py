@@ -55,6 +55,15 @@ class AkeydoService(dbus.service.ServiceInterface):
                 A boolean value to indicate if it was successful or not. If it
                 fails, there may be allocated resources that are not cleaned up.
 
+        Hook (boolean):
+            Accepts the full information for a libvirt QEMU hook including the
+            operation and dispatches to Prepare or Release. This lets the hook
+            script make a single call for any operation instead of selecting a
+            method per operation.
+
+            Returns: The return value of the dispatched method, or True for
+                operations the service ignores.
+
     D-BUS Properties:
 
         Target (string):
@@ -84,9 +93,18 @@ class AkeydoService(dbus.service.ServiceInterface):
         self._released = False
         self._current_host = self.HOST
         self._plugins = tuple(plugin(settings, self) for plugin in plugins)
-        self._targets: list[Optional[str]] = [self.HOST]
+        self._targets: dict[Optional[str], None] = {self.HOST: None}
+        self._target_cycle: tuple[Optional[str], ...] = (self.HOST,)
+        self._target_indices: dict[Optional[str], int] = {self.HOST: 0}
         self._target: Optional[str] = self.HOST
+        self._display_cache: dict[Optional[str], dict[str, str]] = {
+            self.HOST: {"Target": "host device"}
+        }
+        self._vm_configs: dict[str, VirtualMachineConfig] = {}
         self._bus: Optional[dbus.aio.MessageBus] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending_emit: Optional[dict[str, str]] = None
+        self._emit_handle: Optional[asyncio.TimerHandle] = None
         self._lock = threading.Lock()
         super().__init__(settings.dbus.bus_name)
 
@@ -97,6 +115,7 @@ class AkeydoService(dbus.service.ServiceInterface):
         cause the program to hang indefinitely because dbus_next does not yield
         control or timeout.
         """
+        self._loop = asyncio.get_running_loop()
         self._bus = await dbus.aio.MessageBus(
             bus_type=dbus.constants.BusType.SYSTEM
         ).connect()
@@ -181,7 +200,10 @@ class AkeydoService(dbus.service.ServiceInterface):
         logging.debug("Setting target to %s", val)
         val = val or self._current_host
         logging.debug("Using value %s for target", val)
-        display = val or "host device"
+        properties = self._display_cache.setdefault(
+            val, {"Target": val or "host device"}
+        )
+        display = properties["Target"]
         if val == self._target:
             logging.debug("%s selected but %s is already active", display, display)
             if self.released:
@@ -193,9 +215,32 @@ class AkeydoService(dbus.service.ServiceInterface):
             self._target = val
             for plugin in self._plugins:
                 self._call_plugin_func(plugin, "target_changed", val)
-            self.emit_properties_changed({"Target": display})
+            self._pending_emit = properties
+            if self._loop:
+                self._loop.call_soon_threadsafe(self._schedule_emit)
+            else:
+                self._emit_pending_properties()
         return self.target
 
+    def _schedule_emit(self) -> None:
+        """Schedule a flush of the pending property change signal.
+
+        Signal emission is deferred by a few milliseconds so that rapid target
+        changes, such as a flapping hotkey chord or repeated Toggle calls,
+        collapse into a single D-BUS signal carrying the final target.
+        """
+        if self._emit_handle is None:
+            self._emit_handle = self._loop.call_later(
+                0.005, self._emit_pending_properties
+            )
+
+    def _emit_pending_properties(self) -> None:
+        """Emit the most recent pending property change signal."""
+        self._emit_handle = None
+        properties, self._pending_emit = self._pending_emit, None
+        if properties:
+            self.emit_properties_changed(properties)
+
     @dbus.service.method("Toggle")
     def toggle(self) -> s:
         """Cycle the active target to the next virtual machine.
@@ -205,9 +250,9 @@ class AkeydoService(dbus.service.ServiceInterface):
 
         Returns: The new active target.
         """
-        self.target = self._targets[
-            (self._targets.index(self._target) + 1) % len(self._targets)
-        ]
+        cycle = self._target_cycle
+        index = self._target_indices.get(self._target, -1)
+        self.target = cycle[(index + 1) % len(cycle)]
         return self.target
 
     @dbus.service.method("Prepare")
@@ -243,11 +288,15 @@ class AkeydoService(dbus.service.ServiceInterface):
                 logging.info("VM %s is already managed", vm_name)
                 return False
             logging.info("VM %s preparing to start", vm_name)
-            logging.debug(
-                "libvirtd: %s %s %s\n%s", vm_name, sub_op, extra_op, xml_config
-            )
-            config = VirtualMachineConfig(xml_config)
-            self._targets.append(vm_name)
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(
+                    "libvirtd: %s %s %s\n%s", vm_name, sub_op, extra_op, xml_config
+                )
+            config = VirtualMachineConfig(xml_config, self._settings)
+            self._vm_configs[vm_name] = config
+            self._targets[vm_name] = None
+            self._rebuild_cycle()
+            self._display_cache[vm_name] = {"Target": vm_name}
             for plugin in self._plugins:
                 self._call_plugin_func(plugin, "vm_prepare", vm_name, config)
             return True
@@ -287,9 +336,16 @@ class AkeydoService(dbus.service.ServiceInterface):
             logging.debug("Attempted to release unmanaged VM %s", vm_name)
             return False
         logging.info("VM %s shutting down", vm_name)
-        logging.debug("libvirtd: %s %s %s\n%s", vm_name, sub_op, extra_op, xml_config)
-        config = VirtualMachineConfig(xml_config)
-        self._targets.remove(vm_name)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                "libvirtd: %s %s %s\n%s", vm_name, sub_op, extra_op, xml_config
+            )
+        config = self._vm_configs.pop(vm_name, None) or VirtualMachineConfig(
+            xml_config, self._settings
+        )
+        del self._targets[vm_name]
+        self._rebuild_cycle()
+        self._display_cache.pop(vm_name, None)
         if vm_name == self._current_host:
             self.set_host()
         if self._target == vm_name:
@@ -305,6 +361,41 @@ class AkeydoService(dbus.service.ServiceInterface):
                 )
         return True
 
+    @dbus.service.method("Hook")
+    def vm_hook(
+        self, vm_name: s, op: s, sub_op: s, extra_op: s, xml_config: s
+    ) -> b:
+        """Handle a libvirt QEMU hook for any operation.
+
+        This is a D-BUS method that dispatches to Prepare or Release based on
+        the hook operation, so the hook script can forward every invocation
+        with a single method call rather than mapping operations to methods
+        itself.
+
+        Args:
+            vm_name: The name of the virtual machine the hook fired for.
+            op: The libvirt operation, e.g. "prepare" or "release".
+            sub_op: The libvirt sub-operation.
+            extra_op: The libvirt extra-operation. Always "-".
+            xml_config: The libvirt XML definition of the virtual machine.
+
+        Returns: The return value of the dispatched method, or True for
+            operations the service ignores so the hook does not fail them.
+        """
+        if op == "prepare":
+            return self.vm_prepare(vm_name, sub_op, extra_op, xml_config)
+        if op == "release":
+            return self.vm_release(vm_name, sub_op, extra_op, xml_config)
+        logging.debug("Ignoring libvirtd operation %s for VM %s", op, vm_name)
+        return True
+
+    def _rebuild_cycle(self) -> None:
+        """Rebuild the cached toggle cycle after the target map changes."""
+        self._target_cycle = tuple(self._targets)
+        self._target_indices = {
+            target: index for index, target in enumerate(self._target_cycle)
+        }
+
     def set_host(self, vm_name: str = None) -> None:
         """Replace the host target with the given virtual machine.
 
@@ -326,9 +417,10 @@ class AkeydoService(dbus.service.ServiceInterface):
             self.target = vm_name
         self._current_host = vm_name
         if vm_name == self.HOST:
-            self._targets.insert(0, None)
-        elif None in self._targets:
-            self._targets.remove(None)
+            self._targets = {self.HOST: None, **self._targets}
+        else:
+            self._targets.pop(self.HOST, None)
+        self._rebuild_cycle()
 
     def _call_plugin_func(self, plugin: object, func_name: str, *args: Any) -> None:
         """Call the given function asyncronously on the plugin if it exists.
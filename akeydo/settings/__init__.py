@@ -7,11 +7,19 @@ Classes:
 
 from __future__ import annotations
 
+import copy
 import logging
+import os
 import pathlib
+import threading
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 from .dbus import DbusSettings
 from .hotkey import HotkeySettings
 from .. import plugins
@@ -19,6 +27,44 @@ from .. import plugins
 __all__ = ("Settings",)
 
 
+_yaml_cache: dict[str, tuple[int, int, int, dict]] = {}
+_yaml_cache_lock = threading.Lock()
+
+
+def _load_config(config: pathlib.Path) -> dict:
+    """Load a YAML configuration file, reusing a cached parse when unchanged.
+
+    Parsed files are cached at module level keyed by resolved path and
+    invalidated when the file's mtime, size, or inode changes, so repeated
+    service construction skips both the read and the parse. A deep copy of
+    the cached data is returned so callers may mutate it freely.
+
+    Args:
+        config: A Path to a YAML configuration file.
+
+    Returns: The parsed configuration, or an empty dictionary if the file
+        does not exist or cannot be read.
+    """
+    path = str(config.resolve())
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    with _yaml_cache_lock:
+        entry = _yaml_cache.get(path)
+        if entry and entry[:3] == key:
+            return copy.deepcopy(entry[3])
+    try:
+        with open(path, "rb") as config_file:
+            data = yaml.load(config_file, Loader=_YamlLoader) or {}
+    except OSError:
+        return {}
+    with _yaml_cache_lock:
+        _yaml_cache[path] = key + (data,)
+    return copy.deepcopy(data)
+
+
 class Settings:
     """A class for parsing and storing configuration options for the service."""
 
@@ -34,10 +80,7 @@ class Settings:
                 the service including hotkeys used for mapping keys to virtual
                 machines.
         """
-        data = {}
-        if config.is_file():
-            with open(config.resolve()) as config_file:
-                data = yaml.safe_load(config_file) or {}
+        data = _load_config(config)
         self.dbus = DbusSettings.from_dict(data.get("dbus") or {})
         self.hotkeys = HotkeySettings.from_dict(data.get("hotkeys") or {})
         self.enabled_plugins = {}
@@ -34,7 +34,10 @@ def handle_exception(task: asyncio.Task) -> None:
             logging.exception("Exception raised by task %s", task.get_name())
         else:
             logging.error("%s", e)
-        context_loop = asyncio.get_event_loop()
+        try:
+            context_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            context_loop = None
         task_loop = task.get_loop()
         if task_loop is not context_loop:
             task_loop.stop()